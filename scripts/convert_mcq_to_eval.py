@@ -1,7 +1,13 @@
-import json
 import argparse
+import functools
+import sys
 from pathlib import Path
 
+import fast_json
+
+
+WRITE_BUFFER_SIZE = 1 << 20
+
 
 def derive_knowledge(meta: dict) -> str:
     """
@@ -12,7 +18,17 @@ def derive_knowledge(meta: dict) -> str:
     sp = (meta or {}).get("source_path", "")
     if not sp:
         return "unknown"
+    return _knowledge_from_path(sp)
+
+
+@functools.lru_cache(maxsize=1024)
+def _knowledge_from_path(sp: str) -> str:
+    # Records come from a handful of source files, so each distinct path is
+    # only parsed once and every record shares one interned label string.
+    return sys.intern(_parse_knowledge(sp))
+
 
+def _parse_knowledge(sp: str) -> str:
     # Normalize separators and split
     parts = sp.replace("\\", "/").split("/")
 
@@ -43,30 +59,39 @@ def main():
 
     count = 0
 
-    with in_path.open("r", encoding="utf-8") as fin, out_path.open("w", encoding="utf-8") as fout:
-        for line in fin:
-            line = line.strip()
-            if not line:
-                continue
-
-            obj = json.loads(line)
-
-            q = (obj.get("question") or "").strip()
-            ans_idx = (obj.get("answer_idx") or "").strip()
-
-            meta = obj.get("_extract_meta") or {}
-            knowledge = derive_knowledge(meta)
-
-            rec = {
-                "Knowledge": knowledge,
-                "Question": q,
-                "Answer": ans_idx,
-                "Prediction": "",
-                "Tag": args.tag,
-            }
-
-            fout.write(json.dumps(rec, ensure_ascii=False) + "\n")
-            count += 1
+    # Encoded records are collected in a bytearray and written out in
+    # ~1 MiB pieces rather than one write() call per record.
+    buf = bytearray()
+    with in_path.open("rb") as fin, out_path.open("wb", buffering=WRITE_BUFFER_SIZE) as fout:
+        try:
+            for line in fin:
+                if line.isspace():
+                    continue
+
+                obj = fast_json.loads(line)
+
+                q = (obj.get("question") or "").strip()
+                ans_idx = (obj.get("answer_idx") or "").strip()
+
+                meta = obj.get("_extract_meta") or {}
+                knowledge = derive_knowledge(meta)
+
+                rec = {
+                    "Knowledge": knowledge,
+                    "Question": q,
+                    "Answer": ans_idx,
+                    "Prediction": "",
+                    "Tag": args.tag,
+                }
+
+                buf += fast_json.dumps(rec)
+                buf += b"\n"
+                if len(buf) >= WRITE_BUFFER_SIZE:
+                    fout.write(buf)
+                    buf.clear()
+                count += 1
+        finally:
+            fout.write(buf)
 
     print(f"Converted {count} records.")
     print(f"Saved to: {out_path}")
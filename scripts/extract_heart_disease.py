@@ -1,9 +1,38 @@
 #!/usr/bin/env python3
 import argparse
+import codecs
+import functools
 import json
+import mmap
 import os
 import re
-from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import fast_json
+
+try:
+    import ahocorasick  # type: ignore  # optional: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None  # type: ignore
+
+try:
+    import hyperscan  # type: ignore  # optional: pip install hyperscan
+except ImportError:
+    hyperscan = None  # type: ignore
+
+try:
+    import ijson  # type: ignore  # optional: pip install ijson
+except ImportError:
+    ijson = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore
+    from numba import njit  # type: ignore  # optional: pip install numba
+except ImportError:
+    njit = None  # type: ignore
 
 
 DEFAULT_KEYWORDS_EN = [
@@ -60,23 +89,227 @@ def iter_files(root: str, allowed_exts: Sequence[str]) -> Iterator[str]:
     if os.path.isfile(root):
         yield root
         return
-    for dirpath, _, filenames in os.walk(root):
-        for filename in filenames:
-            ext = os.path.splitext(filename)[1].lower()
-            if ext in allowed_exts:
-                yield os.path.join(dirpath, filename)
+    # Same top-down order as os.walk: a directory's files, then each
+    # subdirectory in turn. Unreadable directories are skipped silently.
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        subdirs: List[str] = []
+        with entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # Like os.walk, list symlinks to directories as
+                    # directories but do not descend into them.
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in allowed_exts:
+                    yield entry.path
+        stack.extend(reversed(subdirs))
 
 
-def iter_jsonl_records(path: str, encoding: str) -> Iterator[Tuple[int, Any]]:
-    with open(path, "r", encoding=encoding, errors="replace") as f:
-        for line_no, line in enumerate(f, start=1):
-            s = line.strip()
-            if not s:
+_READ_CHUNK_SIZE = 1 << 20
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+class _ParseErrorRecord(dict):
+    """The {"text": ..., "_parse_error": ...} record kept for an unparsable JSONL line.
+
+    Only the line text is matched against the keywords, never the field
+    names or the error message.
+    """
+
+
+# The record of a line that is blank once decoded; entries of
+# iter_jsonl_candidates with it only carry a count.
+_NO_RECORD = object()
+
+
+def _parse_bad_jsonl_line(line: Any, encoding: str) -> Any:
+    # Undecodable bytes, invalid JSON or non-ASCII whitespace around the
+    # value: retry on the stripped text with bad bytes replaced, and keep
+    # the line as a parse-error record if that fails too. A line of only
+    # whitespace (e.g. U+3000) is blank, as str.strip() sees it.
+    text = line.decode(encoding, errors="replace") if isinstance(line, bytes) else line
+    text = text.strip()
+    if not text:
+        return _NO_RECORD
+    try:
+        return fast_json.loads(text)
+    except json.JSONDecodeError as e:
+        return _ParseErrorRecord(text=text, _parse_error=f"invalid_json: {e}")
+
+
+def iter_jsonl_records(
+    path: str, encoding: str, start: int = 0, end: Optional[int] = None
+) -> Iterator[Tuple[int, Any, Optional[Union[str, bytes]]]]:
+    """Yield (line number, parsed record, raw line) for each non-blank line.
+
+    The raw line is None unless it parsed as-is, i.e. without replacing
+    undecodable bytes. start and end restrict reading to the lines in that
+    byte range, numbered from its start; they are only supported for
+    encodings with single-byte newlines.
+    """
+    raw: Optional[Union[str, bytes]]
+    if "\n".encode(encoding) != b"\n":
+        # e.g. UTF-16: newlines are not single bytes, let the text layer split lines
+        with open(path, "r", encoding=encoding, errors="replace") as f:
+            for line_no, line in enumerate(f, start=1):
+                if line.isspace():
+                    continue
+                try:
+                    record, raw = fast_json.loads(line), line
+                except ValueError:
+                    record, raw = _parse_bad_jsonl_line(line, encoding), None
+                    if record is _NO_RECORD:
+                        continue
+                yield line_no, record, raw
+        return
+
+    # Read large binary chunks and split lines ourselves; UTF-8 lines go to
+    # the JSON parser as bytes without a separate decoding step.
+    decode = codecs.lookup(encoding).name != "utf-8"
+    with open(path, "rb") as f:
+        f.seek(start)
+        line_no = 0
+        tail = b""
+        while True:
+            buf = f.read(_READ_CHUNK_SIZE if end is None else min(_READ_CHUNK_SIZE, end - f.tell()))
+            if buf:
+                lines = (tail + buf).split(b"\n")
+                tail = lines.pop()
+            elif tail:
+                lines, tail = [tail], b""
+            else:
+                break
+            for line_bytes in lines:
+                line_no += 1
+                if not line_bytes or line_bytes.isspace():
+                    continue
+                data: Union[str, bytes] = line_bytes.decode(encoding, errors="replace") if decode else line_bytes
+                try:
+                    record, raw = fast_json.loads(data), data
+                except ValueError:
+                    record, raw = _parse_bad_jsonl_line(data, encoding), None
+                    if record is _NO_RECORD:
+                        continue
+                yield line_no, record, raw
+
+
+# (token, needs a word boundary before it, needs one after it), searched for
+# in ASCII-lowercased UTF-8 lines.
+LinePrefilter = List[Tuple[bytes, bool, bool]]
+
+
+# UTF-8 lines that are blank once decoded, i.e. only hold characters
+# str.isspace() accepts. With endpos at a line start, the empty "line"
+# there matches too, so it cancels the +1 in _count_lines.
+_BLANK_LINE_RE = re.compile(
+    rb"^(?:"
+    + b"|".join(re.escape(chr(c).encode("utf-8")) for c in range(0x3001) if chr(c).isspace() and c != 0x0A)
+    + rb")*(?:\n|\Z)",
+    re.MULTILINE,
+)
+_ASCII_WORD_BYTES = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+
+
+def _count_lines(block: bytes, start: int, end: int) -> Tuple[int, int]:
+    """Return the newlines and the non-blank lines in block[start:end], which starts a line."""
+    newlines = block.count(b"\n", start, end)
+    blank = sum(1 for _ in _BLANK_LINE_RE.finditer(block, start, end))
+    return newlines, newlines + 1 - blank
+
+
+def _candidate_line_starts(lowered: bytes, prefilter: LinePrefilter, limit: int) -> Optional[List[int]]:
+    """Return the sorted offsets of the lines holding a prefilter token.
+
+    Gives up and returns None past limit candidates: with that many,
+    skipping the other lines saves less than the search costs.
+    """
+    starts = set()
+    for token, bound_start, bound_end in prefilter:
+        i = lowered.find(token)
+        while i != -1:
+            j = i + len(token)
+            if (bound_start and i > 0 and lowered[i - 1] in _ASCII_WORD_BYTES) or (
+                bound_end and j < len(lowered) and lowered[j] in _ASCII_WORD_BYTES
+            ):
+                i = lowered.find(token, i + 1)
                 continue
-            try:
-                yield line_no, json.loads(s)
-            except json.JSONDecodeError as e:
-                yield line_no, {"text": s, "_parse_error": f"invalid_json: {e}"}
+            starts.add(lowered.rfind(b"\n", 0, i) + 1)
+            if len(starts) > limit:
+                return None
+            # One hit is enough; continue on the next line.
+            j = lowered.find(b"\n", j)
+            if j == -1:
+                break
+            i = lowered.find(token, j)
+    return sorted(starts)
+
+
+def _parse_jsonl_line(line: bytes) -> Tuple[Any, Optional[bytes]]:
+    try:
+        return fast_json.loads(line), line
+    except ValueError:
+        return _parse_bad_jsonl_line(line, "utf-8"), None
+
+
+def iter_jsonl_candidates(
+    path: str, prefilter: LinePrefilter, start: int = 0, end: Optional[int] = None
+) -> Iterator[Tuple[int, int, Any, Optional[bytes]]]:
+    """Yield (skipped, line number, record, raw line) for UTF-8 JSONL lines containing a prefilter token.
+
+    The file is memory-mapped and searched in ~1 MiB runs of whole lines;
+    other lines are never split out, decoded or parsed unless a run has so
+    many candidates that all of its lines are. skipped counts the non-blank
+    lines left out before each yielded one; entries with record _NO_RECORD
+    only carry that count, like the last one for the lines after the final
+    candidate. start and end work as for iter_jsonl_records.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm) if end is None else end
+            line_no = 0
+            skipped = 0
+            pos = start
+            while pos < size:
+                block_end = mm.find(b"\n", pos + _READ_CHUNK_SIZE, size) + 1 or size
+                block = mm[pos:block_end]
+                pos = block_end
+                starts = _candidate_line_starts(block.lower(), prefilter, block.count(b"\n") // 4 + 1)
+                if starts is None:
+                    lines = block.split(b"\n")
+                    if block.endswith(b"\n"):
+                        lines.pop()
+                    for line in lines:
+                        line_no += 1
+                        if not line or line.isspace():
+                            continue
+                        yield (skipped, line_no, *_parse_jsonl_line(line))
+                        skipped = 0
+                    continue
+
+                prev = 0
+                for line_start in starts:
+                    newlines, nonblank = _count_lines(block, prev, line_start)
+                    line_no += newlines + 1
+                    prev = block.find(b"\n", line_start) + 1 or len(block) + 1
+                    yield (skipped + nonblank, line_no, *_parse_jsonl_line(block[line_start:prev - 1]))
+                    skipped = 0
+                if prev < len(block):
+                    newlines, nonblank = _count_lines(block, prev, len(block))
+                    line_no += newlines
+                    skipped += nonblank
+            if skipped:
+                yield skipped, line_no, _NO_RECORD, None
 
 
 def iter_txt_records(path: str, encoding: str, min_line_length: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
@@ -88,41 +321,51 @@ def iter_txt_records(path: str, encoding: str, min_line_length: int) -> Iterator
             yield line_no, {"text": text}
 
 
-def flatten_strings(value: Any, max_items: int) -> List[str]:
-    out: List[str] = []
+_FLATTEN_BASE_TYPES = (str, dict, list, tuple, set, int, float)
 
-    def visit(v: Any) -> None:
-        nonlocal out
-        if len(out) >= max_items:
-            return
-        if v is None:
-            return
-        if isinstance(v, str):
-            s = v.strip()
-            if s:
-                out.append(s)
-            return
-        if isinstance(v, (int, float, bool)):
-            out.append(str(v))
-            return
-        if isinstance(v, dict):
-            for k, vv in v.items():
-                if len(out) >= max_items:
-                    return
-                if isinstance(k, str) and k.strip():
-                    out.append(k.strip())
-                visit(vv)
-            return
-        if isinstance(v, (list, tuple, set)):
-            for vv in v:
-                if len(out) >= max_items:
-                    return
-                visit(vv)
-            return
-        out.append(str(v))
 
-    visit(value)
-    return out[:max_items]
+def flatten_strings(value: Any, max_items: int) -> List[str]:
+    out: List[str] = []
+    if max_items <= 0:
+        return out
+    # Explicit stack of (iterator, iterates dict items) pairs instead of
+    # recursion; resuming the parent iterator keeps document order.
+    stack: List[Tuple[Iterator[Any], bool]] = [(iter((value,)), False)]
+    while stack:
+        it, dict_items = stack[-1]
+        for v in it:
+            if dict_items:
+                k, v = v
+                if isinstance(k, str):
+                    k = k.strip()
+                    if k:
+                        out.append(k)
+                        if len(out) >= max_items:
+                            return out
+            if v is None:
+                continue
+            t = type(v)
+            if t not in _FLATTEN_BASE_TYPES:
+                # Subclasses (bool included) are handled like their builtin base.
+                t = next((base for base in _FLATTEN_BASE_TYPES if isinstance(v, base)), t)
+            if t is str:
+                v = v.strip()
+                if not v:
+                    continue
+            elif t is dict:
+                stack.append((iter(v.items()), True))
+                break
+            elif t is list or t is tuple or t is set:
+                stack.append((iter(v), False))
+                break
+            else:
+                v = str(v)
+            out.append(v)
+            if len(out) >= max_items:
+                return out
+        else:
+            stack.pop()
+    return out
 
 
 def extract_text_from_record(
@@ -130,12 +373,18 @@ def extract_text_from_record(
     max_items: int,
     include_fields: Optional[Sequence[str]],
     exclude_fields: Sequence[str],
-) -> str:
-    if not isinstance(record, dict):
-        return " ".join(flatten_strings(record, max_items))
-    
-    filtered = _filter_record_fields(record, include_fields, exclude_fields)
-    return " ".join(flatten_strings(filtered, max_items))
+) -> Tuple[str, Any]:
+    """Return the text to match and the record with the field filters applied.
+
+    The filtered record is what gets written out for a match, so callers
+    reuse it instead of filtering the record a second time.
+    """
+    if isinstance(record, _ParseErrorRecord):
+        record = _filter_record_fields(record, include_fields, exclude_fields)
+        return " ".join(flatten_strings(record.get("text"), max_items)), record
+    if isinstance(record, dict):
+        record = _filter_record_fields(record, include_fields, exclude_fields)
+    return " ".join(flatten_strings(record, max_items)), record
 
 
 def _filter_record_fields(
@@ -153,78 +402,998 @@ def _filter_record_fields(
     return record
 
 
-def filter_record_for_output(
-    record: Any,
-    include_fields: Optional[Sequence[str]],
-    exclude_fields: Sequence[str],
-) -> Any:
-    if not isinstance(record, dict):
-        return record
-    return _filter_record_fields(record, include_fields, exclude_fields)
+_WHITESPACE_RE = re.compile(r"\s+")
 
 
-def build_matcher(keywords: Sequence[str]) -> Tuple[re.Pattern, List[str]]:
-    cleaned: List[str] = []
-    for kw in keywords:
-        kw = kw.strip()
-        if kw:
-            cleaned.append(kw)
-    
-    if not cleaned:
-        return re.compile(r"(?!.*)", re.IGNORECASE), []
+def _is_word_char(ch: str) -> bool:
+    # Same definition as the Unicode \w class used by the re module.
+    return ch.isalnum() or ch == "_"
 
-    parts: List[str] = []
-    for kw in cleaned:
-        has_cjk = any("\u4e00" <= ch <= "\u9fff" for ch in kw)
-        if has_cjk:
-            parts.append(re.escape(kw))
-            continue
 
-        kw_stripped = kw.strip()
-        simple_wordish = re.fullmatch(r"[A-Za-z0-9]+", kw_stripped) is not None
-        is_short = len(kw_stripped) <= 3
-        is_all_caps = kw_stripped.isupper() and any(c.isalpha() for c in kw_stripped)
+def _at_word_boundary(text: str, i: int) -> bool:
+    before = i > 0 and _is_word_char(text[i - 1])
+    after = i < len(text) and _is_word_char(text[i])
+    return before != after
 
-        if simple_wordish and (is_short or is_all_caps):
-            parts.append(r"\b" + re.escape(kw_stripped) + r"\b")
-        else:
-            tokens = [re.escape(t) for t in kw_stripped.split()]
-            if len(tokens) > 1:
-                parts.append(r"\b" + r"\s+".join(tokens) + r"\b")
-            else:
-                parts.append(re.escape(kw_stripped))
 
-    pattern = re.compile(r"(" + "|".join(parts) + r")", re.IGNORECASE)
-    return pattern, cleaned
+# The non-ASCII characters re.IGNORECASE matches to each ASCII letter;
+# no other letter has any.
+_NON_ASCII_CASE_VARIANTS = {"i": "\u0130\u0131", "k": "\u212a", "s": "\u017f"}
+_TO_ASCII_LETTER = str.maketrans({ch: letter for letter, chars in _NON_ASCII_CASE_VARIANTS.items() for ch in chars})
+_TO_ASCII_LETTER_RE = re.compile("[" + "".join(_NON_ASCII_CASE_VARIANTS.values()) + "]")
 
 
-def detect_matches(pattern: re.Pattern, text: str, max_hits: int) -> List[str]:
-    hits: List[str] = []
-    for m in pattern.finditer(text):
-        hits.append(m.group(0))
-        if len(hits) >= max_hits:
+def _has_non_ascii_case(ch: str) -> bool:
+    return not ch.isascii() and (ch.lower() != ch or ch.upper() != ch)
+
+
+def _lower_same_length(text: str) -> str:
+    """Lowercase text so that keywords without non-ASCII cased characters match it as with re.IGNORECASE."""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters (e.g. U+0130) lowercase to several code points;
+        # keep those as-is so offsets still line up with the original text.
+        lowered = "".join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+    if not lowered.isascii() and _TO_ASCII_LETTER_RE.search(lowered) is not None:
+        lowered = lowered.translate(_TO_ASCII_LETTER)
+    return lowered
+
+
+def _select_spans(candidates: List[Tuple[int, int, int]], max_hits: int) -> List[Tuple[int, int]]:
+    """Pick non-overlapping (start, keyword_order, end) candidates leftmost-first.
+
+    This mirrors how the regex alternation resolves matches: the earliest start
+    wins, ties go to the keyword listed first, and scanning resumes after it.
+    """
+    spans: List[Tuple[int, int]] = []
+    last_end = 0
+    for start, _, end in sorted(candidates):
+        if start < last_end:
+            continue
+        spans.append((start, end))
+        last_end = end
+        if len(spans) >= max_hits:
             break
+    return spans
+
+
+def _collapsed_hits(text: str, collapsed: str, spans: List[Tuple[int, int]]) -> List[str]:
+    """Slice hits found in collapsed, i.e. _WHITESPACE_RE.sub(" ", text), out of text itself.
+
+    Hits start and end on non-whitespace characters; each longer run of
+    whitespace before one shifts it by the run's length minus one.
+    """
+    if len(collapsed) == len(text):
+        return [text[start:end] for start, end in spans]
+    # Offset in collapsed just after each run, and the total shift there.
+    run_ends: List[int] = []
+    shifts: List[int] = []
+    shift = 0
+    for m in _WHITESPACE_RE.finditer(text):
+        if m.end() - m.start() > 1:
+            shift += m.end() - m.start() - 1
+            run_ends.append(m.end() - shift)
+            shifts.append(shift)
+    hits: List[str] = []
+    for start, end in spans:
+        i = bisect_right(run_ends, start)
+        j = bisect_right(run_ends, end - 1)
+        start += shifts[i - 1] if i else 0
+        end += shifts[j - 1] if j else 0
+        hits.append(text[start:end])
     return hits
 
 
+class AhoCorasickMatcher:
+    """Scan all keywords in a single pass using a pyahocorasick automaton."""
+
+    def __init__(self, specs: Sequence[Tuple[str, bool]]) -> None:
+        # Keywords that only differ in case share one automaton entry.
+        entries: Dict[str, List[Tuple[int, int, bool]]] = {}
+        for order, (kw, bounded) in enumerate(specs):
+            key = _lower_same_length(kw)
+            entries.setdefault(key, []).append((order, len(key), bounded))
+
+        self.normalize_whitespace = any(" " in key for key in entries)
+        self.automaton = ahocorasick.Automaton()
+        for key, value in entries.items():
+            self.automaton.add_word(key, value)
+        self.automaton.make_automaton()
+
+    def find_hits(self, text: str, max_hits: int) -> List[str]:
+        collapsed = _WHITESPACE_RE.sub(" ", text) if self.normalize_whitespace else text
+        lowered = _lower_same_length(collapsed)
+
+        # Matches arrive ordered by end offset, so collect them all before
+        # selecting; stopping at max_hits here could drop an earlier start.
+        candidates: List[Tuple[int, int, int]] = []
+        for last, value in self.automaton.iter(lowered):
+            end = last + 1
+            for order, length, bounded in value:
+                start = end - length
+                if bounded and not (_at_word_boundary(lowered, start) and _at_word_boundary(lowered, end)):
+                    continue
+                candidates.append((start, order, end))
+        if not candidates:
+            return []
+        return _collapsed_hits(text, collapsed, _select_spans(candidates, max_hits))
+
+    def has_match(self, text: str) -> bool:
+        if self.normalize_whitespace:
+            text = _WHITESPACE_RE.sub(" ", text)
+        lowered = _lower_same_length(text)
+        for last, value in self.automaton.iter(lowered):
+            end = last + 1
+            for _, length, bounded in value:
+                start = end - length
+                if not bounded or (_at_word_boundary(lowered, start) and _at_word_boundary(lowered, end)):
+                    return True
+        return False
+
+
+class LiteralMatcher:
+    """Find each keyword with str.find over the lowercased text."""
+
+    def __init__(self, specs: Sequence[Tuple[str, bool]]) -> None:
+        self.keywords = [(order, _lower_same_length(kw), bounded) for order, (kw, bounded) in enumerate(specs)]
+        # A keyword with a non-ASCII character (e.g. any CJK keyword) cannot
+        # occur in ASCII-only text, so those searches are skipped for it.
+        self.ascii_keywords = [entry for entry in self.keywords if entry[1].isascii()]
+        self.normalize_whitespace = any(" " in kw for _, kw, _ in self.keywords)
+
+    def find_hits(self, text: str, max_hits: int) -> List[str]:
+        collapsed = _WHITESPACE_RE.sub(" ", text) if self.normalize_whitespace else text
+        lowered = _lower_same_length(collapsed)
+
+        candidates: List[Tuple[int, int, int]] = []
+        keywords = self.ascii_keywords if lowered.isascii() else self.keywords
+        for order, kw, bounded in keywords:
+            start = lowered.find(kw)
+            while start != -1:
+                end = start + len(kw)
+                if not bounded or (_at_word_boundary(lowered, start) and _at_word_boundary(lowered, end)):
+                    candidates.append((start, order, end))
+                start = lowered.find(kw, start + 1)
+        if not candidates:
+            return []
+        return _collapsed_hits(text, collapsed, _select_spans(candidates, max_hits))
+
+    def has_match(self, text: str) -> bool:
+        if self.normalize_whitespace:
+            text = _WHITESPACE_RE.sub(" ", text)
+        lowered = _lower_same_length(text)
+        keywords = self.ascii_keywords if lowered.isascii() else self.keywords
+        for _, kw, bounded in keywords:
+            start = lowered.find(kw)
+            while start != -1:
+                end = start + len(kw)
+                if not bounded or (_at_word_boundary(lowered, start) and _at_word_boundary(lowered, end)):
+                    return True
+                start = lowered.find(kw, start + 1)
+        return False
+
+
+# Larger automata (huge CJK keyword lists) stay on the str.find path.
+_MAX_AUTOMATON_CELLS = 1 << 20
+
+
+def _build_literal_automaton(keys: Sequence[str]) -> Optional[Tuple[Any, ...]]:
+    """Encode an Aho-Corasick DFA over the keys' characters as int32 arrays."""
+    alphabet = {ch: i + 1 for i, ch in enumerate(sorted({ch for key in keys for ch in key}))}
+    children: List[Dict[int, int]] = [{}]
+    outputs: List[List[int]] = [[]]
+    for k, key in enumerate(keys):
+        state = 0
+        for ch in key:
+            nxt = children[state].get(alphabet[ch])
+            if nxt is None:
+                nxt = len(children)
+                children[state][alphabet[ch]] = nxt
+                children.append({})
+                outputs.append([])
+            state = nxt
+        outputs[state].append(k)
+
+    width = len(alphabet) + 1
+    if len(children) * width > _MAX_AUTOMATON_CELLS:
+        return None
+    goto = np.zeros((len(children), width), dtype=np.int32)
+    fail = [0] * len(children)
+    queue: Deque[int] = deque()
+    for a, first in children[0].items():
+        goto[0, a] = first
+        queue.append(first)
+    while queue:
+        state = queue.popleft()
+        outputs[state] = outputs[state] + outputs[fail[state]]
+        for a in range(width):
+            child = children[state].get(a)
+            if child is None:
+                goto[state, a] = goto[fail[state], a]
+            else:
+                goto[state, a] = child
+                fail[child] = goto[fail[state], a]
+                queue.append(child)
+
+    # Multi-word keys are stored with single spaces; every whitespace
+    # character maps to the space column and the scan folds runs of them.
+    space = alphabet.get(" ", -1)
+    spaces = [c for c in range(0x3001) if chr(c).isspace()] if space != -1 else []
+    char_map = np.zeros(max([ord(ch) for ch in alphabet] + spaces) + 1, dtype=np.int32)
+    char_map[spaces] = space
+    for ch, a in alphabet.items():
+        char_map[ord(ch)] = a
+    out_ptr = np.zeros(len(children) + 1, dtype=np.int32)
+    np.cumsum([len(out) for out in outputs], out=out_ptr[1:])
+    out_keys = np.array([k for out in outputs for k in out], dtype=np.int32)
+    return char_map, goto, out_ptr, out_keys, space
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _ascii_word(c):
+        return (48 <= c <= 57) or (65 <= c <= 90) or (97 <= c <= 122) or c == 95
+
+    @njit(cache=True)
+    def _boundary_state(buf, i):
+        # 1: word boundary at i, 0: none, 2: a neighbour is non-ASCII and
+        # needs the Unicode check in Python.
+        before = False
+        if i > 0:
+            if buf[i - 1] >= 128:
+                return 2
+            before = _ascii_word(buf[i - 1])
+        after = False
+        if i < buf.shape[0]:
+            if buf[i] >= 128:
+                return 2
+            after = _ascii_word(buf[i])
+        return 1 if before != after else 0
+
+    @njit(cache=True)
+    def _scan_literals(buf, char_map, goto, out_ptr, out_keys, space, key_lens, key_bounded):
+        # Rows of (start, end, key, status) in buf offsets; status is as for
+        # _boundary_state, with 2 also marking keys of mixed boundedness.
+        found = np.empty((16, 4), dtype=np.int64)
+        count = 0
+        # Offset in buf of each character left after folding whitespace.
+        positions = np.empty(buf.shape[0], dtype=np.int64)
+        folded = 0
+        prev = -1
+        state = 0
+        for i in range(buf.shape[0]):
+            c = buf[i]
+            a = char_map[c] if c < char_map.shape[0] else 0
+            if a == space and prev == space:
+                continue
+            prev = a
+            positions[folded] = i
+            folded += 1
+            state = goto[state, a]
+            for j in range(out_ptr[state], out_ptr[state + 1]):
+                k = out_keys[j]
+                start = positions[folded - key_lens[k]]
+                status = 1
+                if key_bounded[k] == 1:
+                    left = _boundary_state(buf, start)
+                    if left == 0:
+                        continue
+                    right = _boundary_state(buf, i + 1)
+                    if right == 0:
+                        continue
+                    status = 1 if left == 1 and right == 1 else 2
+                elif key_bounded[k] == 2:
+                    status = 2
+                if count == found.shape[0]:
+                    grown = np.empty((count * 2, 4), dtype=np.int64)
+                    grown[:count] = found
+                    found = grown
+                found[count, 0] = start
+                found[count, 1] = i + 1
+                found[count, 2] = k
+                found[count, 3] = status
+                count += 1
+        return found[:count]
+
+
+class CompiledLiteralMatcher(LiteralMatcher):
+    """LiteralMatcher whose scan runs in a Numba-compiled Aho-Corasick loop."""
+
+    def __init__(self, specs: Sequence[Tuple[str, bool]], automaton: Tuple[Any, ...], keys: List[str]) -> None:
+        super().__init__(specs)
+        self.automaton = automaton
+        self.key_specs: List[List[Tuple[int, bool]]] = [[] for _ in keys]
+        index = {key: k for k, key in enumerate(keys)}
+        for order, kw, bounded in self.keywords:
+            self.key_specs[index[kw]].append((order, bounded))
+        self.key_lens = np.array([len(key) for key in keys], dtype=np.int32)
+        # 0: no spec is bounded, 1: every spec is (the loop filters on
+        # ASCII neighbours), 2: mixed, all checked here.
+        self.key_bounded = np.array(
+            [
+                0 if not any(b for _, b in entries) else 1 if all(b for _, b in entries) else 2
+                for entries in self.key_specs
+            ],
+            dtype=np.int8,
+        )
+
+    @classmethod
+    def create(cls, specs: Sequence[Tuple[str, bool]]) -> Optional["CompiledLiteralMatcher"]:
+        keys = list(dict.fromkeys(_lower_same_length(kw) for kw, _ in specs))
+        automaton = _build_literal_automaton(keys)
+        if automaton is None:
+            return None
+        return cls(specs, automaton, keys)
+
+    def find_hits(self, text: str, max_hits: int) -> List[str]:
+        lowered = _lower_same_length(text)
+        buf = np.frombuffer(lowered.encode("utf-32-le"), dtype=np.uint32)
+        found = _scan_literals(buf, *self.automaton, self.key_lens, self.key_bounded)  # type: ignore
+        if not len(found):
+            return []
+
+        candidates: List[Tuple[int, int, int]] = []
+        for start, end, k, status in found.tolist():
+            for order, bounded in self.key_specs[k]:
+                if (
+                    bounded
+                    and status != 1
+                    and not (_at_word_boundary(lowered, start) and _at_word_boundary(lowered, end))
+                ):
+                    continue
+                candidates.append((start, order, end))
+        if not candidates:
+            return []
+        return [text[start:end] for start, end in _select_spans(candidates, max_hits)]
+
+    def has_match(self, text: str) -> bool:
+        # One compiled pass over the text is cheaper than the str.find loop,
+        # even though it does not stop at the first hit.
+        return bool(self.find_hits(text, 1))
+
+
+# \s as the re module defines it for str patterns; Hyperscan's \s is ASCII-only.
+_HS_SPACE_CLASS = "[" + "".join(f"\\x{{{c:x}}}" for c in range(0x3001) if chr(c).isspace()) + "]"
+
+
+# Hyperscan's caseless mode matches k and s to their non-ASCII variants but
+# not i, so each of these letters becomes a class listing them all.
+_HS_LETTER_CLASSES = {
+    letter: "[" + letter + "".join(f"\\x{{{ord(ch):x}}}" for ch in chars) + "]"
+    for letter, chars in _NON_ASCII_CASE_VARIANTS.items()
+}
+
+
+def _utf8_char_word(data: bytes, start: int, end: int) -> bool:
+    return _is_word_char(data[start:end].decode("utf-8", errors="replace")[:1])
+
+
+def _utf8_at_word_boundary(data: bytes, i: int) -> bool:
+    before = False
+    if i > 0:
+        j = i - 1
+        while j > 0 and 0x80 <= data[j] < 0xC0:
+            j -= 1
+        before = _utf8_char_word(data, j, i)
+    after = False
+    if i < len(data):
+        j = i + 1
+        while j < len(data) and 0x80 <= data[j] < 0xC0:
+            j += 1
+        after = _utf8_char_word(data, i, j)
+    return before != after
+
+
+def _hyperscan_expression(kw: str, bounded: bool) -> bytes:
+    expr = (_HS_SPACE_CLASS + "+").join(
+        "".join(_HS_LETTER_CLASSES.get(ch.lower(), re.escape(ch)) for ch in token) for token in kw.split(" ")
+    )
+    if bounded:
+        # Hyperscan only has an ASCII \b (and none in UCP mode). Next to an
+        # ASCII word character it is implied by the Unicode one, so it is a
+        # safe prefilter there; find_hits checks the real boundary. Letters
+        # with non-ASCII variants may match a character \b sees as non-word.
+        if _is_word_char(kw[0]) and kw[0].isascii() and kw[0].lower() not in _HS_LETTER_CLASSES:
+            expr = r"\b" + expr
+        if _is_word_char(kw[-1]) and kw[-1].isascii() and kw[-1].lower() not in _HS_LETTER_CLASSES:
+            expr = expr + r"\b"
+    return expr.encode("utf-8")
+
+
+class HyperscanMatcher:
+    """Scan all keywords with a compiled Hyperscan block-mode database."""
+
+    def __init__(self, specs: Sequence[Tuple[str, bool]]) -> None:
+        self.bounded = [bounded for _, bounded in specs]
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_SOM_LEFTMOST
+        self.database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        self.database.compile(
+            expressions=[_hyperscan_expression(kw, bounded) for kw, bounded in specs],
+            ids=list(range(len(specs))),
+            elements=len(specs),
+            flags=[flags] * len(specs),
+        )
+
+    def find_hits(self, text: str, max_hits: int) -> List[str]:
+        data = text.encode("utf-8")
+        bounded = self.bounded
+        candidates: List[Tuple[int, int, int]] = []
+
+        def on_match(order: int, start: int, end: int, flags: int, context: Any) -> None:
+            if bounded[order] and not (_utf8_at_word_boundary(data, start) and _utf8_at_word_boundary(data, end)):
+                return
+            candidates.append((start, order, end))
+
+        self.database.scan(data, match_event_handler=on_match)
+        if not candidates:
+            return []
+        return [data[start:end].decode("utf-8") for start, end in _select_spans(candidates, max_hits)]
+
+    def has_match(self, text: str) -> bool:
+        data = text.encode("utf-8")
+        bounded = self.bounded
+
+        def on_match(order: int, start: int, end: int, flags: int, context: Any) -> Optional[bool]:
+            if bounded[order] and not (_utf8_at_word_boundary(data, start) and _utf8_at_word_boundary(data, end)):
+                return None
+            return True  # stops the scan
+
+        try:
+            self.database.scan(data, match_event_handler=on_match)
+        except hyperscan.ScanTerminated:
+            return True
+        return False
+
+
+class RegexMatcher:
+    """Run a keyword alternation over the text.
+
+    Unless the pattern was compiled with re.IGNORECASE, it is a
+    case-sensitive alternation of lowercased keywords, run over the
+    lowercased text.
+    """
+
+    def __init__(self, pattern: re.Pattern) -> None:
+        self.pattern = pattern
+        self.lower_text = not pattern.flags & re.IGNORECASE
+
+    def find_hits(self, text: str, max_hits: int) -> List[str]:
+        hits: List[str] = []
+        # Lowering once up front is cheaper than re.IGNORECASE folding the
+        # case of every character the engine looks at.
+        for m in self.pattern.finditer(_lower_same_length(text) if self.lower_text else text):
+            hits.append(text[m.start():m.end()])
+            if len(hits) >= max_hits:
+                break
+        return hits
+
+    def has_match(self, text: str) -> bool:
+        return self.pattern.search(_lower_same_length(text) if self.lower_text else text) is not None
+
+
+Matcher = Union[HyperscanMatcher, AhoCorasickMatcher, LiteralMatcher, RegexMatcher]
+
+_REGEX_META_RE = re.compile(r"[\\.^$|*+?()\[\]{}]")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+_WORDISH_RE = re.compile(r"[A-Za-z0-9]+")
+
+
+@functools.lru_cache(maxsize=1024)
+def _keyword_spec(kw: str) -> Tuple[str, str, bool]:
+    """Return the regex alternative, literal form and word-boundary flag of a stripped keyword."""
+    # Cached: build_matcher and build_line_prefilter both classify every
+    # keyword, and worker processes forked after main's calls inherit it.
+    if _CJK_RE.search(kw) is not None:
+        return re.escape(kw), " ".join(kw.split()), False
+
+    simple_wordish = _WORDISH_RE.fullmatch(kw) is not None
+    is_short = len(kw) <= 3
+    is_all_caps = kw.isupper() and any(c.isalpha() for c in kw)
+
+    if simple_wordish and (is_short or is_all_caps):
+        return r"\b" + re.escape(kw) + r"\b", kw, True
+    tokens = kw.split()
+    if len(tokens) > 1:
+        return r"\b" + r"\s+".join(re.escape(t) for t in tokens) + r"\b", " ".join(tokens), True
+    return re.escape(kw), kw, False
+
+
+def _build_regex_matcher(cleaned: Sequence[str]) -> RegexMatcher:
+    """Build the re-based matcher, which handles any keyword; the other matchers must return the same hits."""
+    parts = [_keyword_spec(kw)[0] for kw in cleaned]
+    first_chars = {kw[0] for kw in cleaned}
+    flags = 0
+    if any(_has_non_ascii_case(ch) for kw in cleaned for ch in kw):
+        # Lowercasing only agrees with re.IGNORECASE for keywords whose
+        # cased characters are all ASCII (e.g. not for "οδοσ" and "ΟΔΟΣ").
+        flags = re.IGNORECASE
+    else:
+        # Apart from \b and \s the alternatives are escaped keyword text,
+        # where re.escape never adds a backslash before a letter.
+        parts = [part.lower() for part in parts]
+        first_chars = {ch.lower() for ch in first_chars}
+    # Every alternative starts with its keyword's first character, so a
+    # lookahead on that character class lets the engine skip most positions
+    # without trying each branch.
+    first_class = "".join(re.escape(ch) for ch in sorted(first_chars))
+    pattern = re.compile(r"(?=[" + first_class + r"])(" + "|".join(parts) + r")", flags)
+    return RegexMatcher(pattern)
+
+
+def build_matcher(keywords: Sequence[str]) -> Tuple[Matcher, List[str]]:
+    cleaned = [kw for kw in (k.strip() for k in keywords) if kw]
+    if not cleaned:
+        return LiteralMatcher([]), []
+
+    # (literal keyword, needs word boundaries) pairs for the non-regex matchers
+    specs: List[Tuple[str, bool]] = []
+    for kw in cleaned:
+        _, literal, bounded = _keyword_spec(kw)
+        specs.append((literal, bounded))
+
+    if any(_has_non_ascii_case(ch) for kw in cleaned for ch in kw):
+        # Only re.IGNORECASE matches case variants of non-ASCII letters the
+        # way the regex always has.
+        return _build_regex_matcher(cleaned), cleaned
+    if hyperscan is not None:
+        try:
+            return HyperscanMatcher(specs), cleaned
+        except hyperscan.error:
+            pass
+    if ahocorasick is not None:
+        return AhoCorasickMatcher(specs), cleaned
+    if not any(_REGEX_META_RE.search(kw) for kw in cleaned):
+        if njit is not None:
+            matcher = CompiledLiteralMatcher.create(specs)
+            if matcher is not None:
+                return matcher, cleaned
+        return LiteralMatcher(specs), cleaned
+    return _build_regex_matcher(cleaned), cleaned
+
+
+def detect_matches(pattern: Matcher, text: str, max_hits: int) -> List[str]:
+    return pattern.find_hits(text, max_hits)
+
+
+def has_match(pattern: Matcher, text: str) -> bool:
+    """Like bool(detect_matches(...)), but stops at the first valid hit."""
+    return pattern.has_match(text)
+
+
+# Lowercased characters of str() of ints, floats and bools, the only text
+# a parsed JSONL line adds to its record that is not verbatim in the line.
+_NUMBER_TEXT_CHARS = frozenset("0123456789+-.einfatruls")
+
+
+def _prefilter_token(token: str, bound_start: bool, bound_end: bool) -> Optional[Tuple[bytes, bool, bool]]:
+    """Return the prefilter entry of a keyword token, or None if it cannot serve as one."""
+    # Tokens never span two flattened values, so one with a character no
+    # number or bool gives can only match inside a string from the line.
+    if _NUMBER_TEXT_CHARS.issuperset(token):
+        return None
+    for ch in token:
+        # Lines are only lowercased bytewise; U+FFFD may stand for
+        # undecodable bytes in the line.
+        if ch == "\ufffd" or _has_non_ascii_case(ch):
+            return None
+    # Hits need a Unicode word boundary, which implies the ASCII one next
+    # to an ASCII word character.
+    bound_start = bound_start and token[0].isascii() and _is_word_char(token[0])
+    bound_end = bound_end and token[-1].isascii() and _is_word_char(token[-1])
+    return token.encode("utf-8"), bound_start, bound_end
+
+
+def build_line_prefilter(keywords: Sequence[str]) -> Optional[LinePrefilter]:
+    """Pick byte strings that every UTF-8 JSONL line whose record can match contains.
+
+    Each keyword contributes its longest usable token. A backslash also
+    marks a candidate line since escaped strings are not verbatim in the
+    line. Returns None when some keyword has no token that is safe to use.
+    """
+    prefilter: LinePrefilter = [(b"\\", False, False)]
+    for kw in keywords:
+        kw = kw.strip()
+        if not kw:
+            continue
+        _, literal, bounded = _keyword_spec(kw)
+        tokens = _lower_same_length(literal).split()
+        entry: Optional[Tuple[bytes, bool, bool]] = None
+        for i, token in sorted(enumerate(tokens), key=lambda item: len(item[1]), reverse=True):
+            entry = _prefilter_token(token, bounded and i == 0, bounded and i == len(tokens) - 1)
+            if entry is not None:
+                break
+        if entry is None:
+            return None
+        # Keyword letters also match their non-ASCII case variants, which
+        # bytewise lowering leaves alone; lines with those are candidates.
+        for letter, chars in _NON_ASCII_CASE_VARIANTS.items():
+            if letter.encode() in entry[0]:
+                prefilter.extend((ch.encode("utf-8"), False, False) for ch in chars)
+        prefilter.append(entry)
+    if len(prefilter) == 1:
+        return None
+    # Drop entries that a less strictly bounded one for the same token covers.
+    entries = dict.fromkeys(prefilter)
+    return [
+        (token, bs, be)
+        for token, bs, be in entries
+        if not any((token, s, e) in entries for s in {False, bs} for e in {False, be} if (s, e) != (bs, be))
+    ]
+
+
 def ensure_parent_dir(path: str) -> None:
     parent = os.path.dirname(os.path.abspath(path))
     if parent:
         os.makedirs(parent, exist_ok=True)
 
 
-def _load_json_file(path: str, encoding: str) -> List[Tuple[int, Any]]:
-    """Safely load a JSON file and return as a list of records."""
+def _split_json_value(obj: Any) -> Iterator[Tuple[int, Any]]:
+    if isinstance(obj, list):
+        yield from enumerate(obj, start=1)
+    elif isinstance(obj, dict):
+        for i, (k, v) in enumerate(obj.items(), start=1):
+            yield i, {k: v}
+    else:
+        yield 1, obj
+
+
+def _iter_json_stream(f: Any, is_array: bool) -> Iterator[Tuple[int, Any]]:
+    with f:
+        if is_array:
+            yield from enumerate(ijson.items(f, "item", use_float=True), start=1)
+        else:
+            for i, (k, v) in enumerate(ijson.kvitems(f, "", use_float=True), start=1):
+                yield i, {k: v}
+
+
+# A \uD800-\uDBFF escape without a low surrogate escape after it; ijson
+# turns those into "?" where json keeps the lone surrogate.
+_LONE_HIGH_SURROGATE_RE = re.compile(rb"\\u[dD][89abAB][0-9a-fA-F]{2}(?!\\u[dD][c-fC-F][0-9a-fA-F]{2})")
+
+
+def _ijson_matches_json(f: Any, is_array: bool) -> bool:
+    """Check in one streaming pass that ijson yields the same records from f as json.load.
+
+    It does not for input json rejects, such as truncated files, and for
+    input ijson's C backend treats differently: NaN and Infinity, integers
+    beyond 64 bits, out-of-range floats, lone surrogate escapes and repeated
+    keys in a top-level object.
+    """
+    events = ijson.sendable_list()
+    if is_array:
+        coro = ijson.items_coro(events, "item", use_float=True)
+    else:
+        coro = ijson.kvitems_coro(events, "", use_float=True)
+    keys = set()
+    tail = b""
     try:
+        while True:
+            chunk = f.read(_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            # The overlap finds escapes split between chunks.
+            if _LONE_HIGH_SURROGATE_RE.search(tail + chunk):
+                return False
+            tail = chunk[-11:]
+            coro.send(chunk)
+            if not is_array:
+                for k, _ in events:
+                    if k in keys:
+                        return False
+                    keys.add(k)
+            events.clear()
+        coro.close()
+    except (ijson.JSONError, ValueError):
+        # ValueError: UnicodeDecodeError for some invalid strings
+        return False
+    return True
+
+
+def _first_non_space_byte(f: Any) -> bytes:
+    while True:
+        chunk = f.read(4096)
+        if not chunk:
+            return b""
+        stripped = chunk.lstrip()
+        if stripped:
+            return stripped[:1]
+
+
+def _load_json_file(path: str, encoding: str) -> Iterator[Tuple[int, Any]]:
+    """Iterate the records of a JSON file.
+
+    Items of a top-level array and members of a top-level object (as
+    single-key dicts) become separate records numbered from 1; any other
+    value is a single record. Arrays and objects are streamed with ijson
+    when it is installed so the whole file never has to fit in memory.
+    A first ijson pass checks the file, and files ijson would read
+    differently from json.load are loaded whole, so the records (and
+    whether the file is skipped as invalid) never depend on ijson.
+    """
+    try:
+        if ijson is not None and codecs.lookup(encoding).name == "utf-8":
+            with open(path, "rb") as f:
+                first = _first_non_space_byte(f)
+                f.seek(0)
+                streamable = first in (b"[", b"{") and _ijson_matches_json(f, is_array=first == b"[")
+            if streamable:
+                return _iter_json_stream(open(path, "rb"), is_array=first == b"[")
+
         with open(path, "r", encoding=encoding, errors="replace") as f:
             obj = json.load(f)
-            return [(1, obj)]
+        return _split_json_value(obj)
     except json.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in file '{path}': {e}")
     except IOError as e:
         raise IOError(f"Failed to read file '{path}': {e}")
 
 
+def _raw_line_may_match(pattern: Matcher, raw: Union[str, bytes]) -> bool:
+    """Cheaply pre-check a JSONL line before flattening its record.
+
+    Every string in the parsed record appears verbatim in the line unless
+    the line uses escapes, so an escape-free line without a keyword hit
+    cannot produce a match. Only valid for keywords that pass
+    raw_line_check_is_safe.
+    """
+    if isinstance(raw, bytes):
+        if b"\\" in raw:
+            return True
+        text = raw.decode("utf-8")
+    else:
+        if "\\" in raw:
+            return True
+        text = raw
+    return has_match(pattern, text)
+
+
+def raw_line_check_is_safe(keywords: Sequence[str]) -> bool:
+    """Tell whether _raw_line_may_match never rejects a line whose record matches one of keywords.
+
+    Hits of a multi-word keyword can span two flattened values, which are
+    not adjacent in the line, and str() of numbers and bools is not in the
+    line either. So every keyword has to be a single token the line
+    prefilter would also use.
+    """
+    for kw in keywords:
+        kw = kw.strip()
+        if not kw:
+            continue
+        tokens = _lower_same_length(_keyword_spec(kw)[1]).split()
+        if len(tokens) != 1 or _prefilter_token(tokens[0], False, False) is None:
+            return False
+    return True
+
+
+def _output_record(path: str, line_no: int, hits: List[str], record: Any) -> Dict[str, Any]:
+    meta = {
+        "source_path": path,
+        "source_line": line_no,
+        "matched_keywords": hits,
+    }
+    if isinstance(record, dict):
+        # Either a fresh dict from the field filter or the parsed record
+        # itself; neither is used again, so it can be extended in place.
+        record["_extract_meta"] = meta
+        return record
+    return {"raw": record, "_extract_meta": meta}
+
+
+# Matches per chunk yielded by scan_file.
+_MATCH_CHUNK_SIZE = 1024
+
+# (records scanned since the previous chunk, matches); each match is
+# (position among the scanned records, line number, hits, filtered record).
+ScanChunk = Tuple[int, List[Tuple[int, int, List[str], Any]]]
+
+
+def scan_file(
+    path: str,
+    pattern: Matcher,
+    options: Dict[str, Any],
+    start: int = 0,
+    end: Optional[int] = None,
+) -> Iterator[ScanChunk]:
+    """Scan one input file, or only the lines in [start, end) of a .jsonl file.
+
+    Yields chunks of up to _MATCH_CHUNK_SIZE matches as they are found, so
+    a file's matches are never all held at once; the last chunk may be
+    empty. Positions are 1-based and, like line numbers, count from start;
+    they let callers apply a global --max-records limit.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    encoding = options["encoding"]
+    include_fields = options["include_fields"]
+    exclude_fields = options["exclude_fields"]
+    max_records = options["max_records"]
+    line_prefilter = options.get("line_prefilter")
+    raw_line_check = options.get("raw_line_check")
+
+    # Entries are (records skipped before this one, line number, record, raw line).
+    try:
+        if ext == ".jsonl" and line_prefilter is not None and codecs.lookup(encoding).name == "utf-8":
+            record_iter: Iterable[Tuple[int, int, Any, Optional[Union[str, bytes]]]] = iter_jsonl_candidates(
+                path, line_prefilter, start, end
+            )
+        elif ext == ".jsonl":
+            jsonl_records = iter_jsonl_records(path, encoding, start, end)
+            record_iter = ((0, line_no, record, raw) for line_no, record, raw in jsonl_records)
+        elif ext == ".txt":
+            txt_records = iter_txt_records(path, encoding, options["min_line_length"])
+            record_iter = ((0, line_no, record, None) for line_no, record in txt_records)
+        elif ext == ".json":
+            record_iter = ((0, i, record, None) for i, record in _load_json_file(path, encoding))
+        else:
+            yield 0, []
+            return
+    except (IOError, ValueError) as e:
+        print(f"Warning: Skipping file '{path}': {e}", flush=True)
+        yield 0, []
+        return
+
+    scanned = 0
+    reported = 0
+    matched: List[Tuple[int, int, List[str], Any]] = []
+    for skipped, line_no, record, raw in record_iter:
+        scanned += skipped
+        if max_records and scanned >= max_records:
+            scanned = max_records
+            break
+        if record is _NO_RECORD:
+            continue
+        scanned += 1
+
+        if raw is not None and raw_line_check and not _raw_line_may_match(pattern, raw):
+            continue
+
+        text, filtered_record = extract_text_from_record(
+            record,
+            options["max_flatten_items"],
+            include_fields=include_fields,
+            exclude_fields=exclude_fields,
+        )
+        hits = detect_matches(pattern, text, options["max_hits_per_record"])
+        if not hits:
+            continue
+        matched.append((scanned, line_no, hits, filtered_record))
+        if len(matched) >= _MATCH_CHUNK_SIZE:
+            yield scanned - reported, matched
+            reported = scanned
+            matched = []
+
+    yield scanned - reported, matched
+
+
+# Input bytes per worker task. A task's matches go back to the main process
+# in one piece, so this bounds what each queued or finished task holds.
+_TASK_SIZE = 1 << 20
+
+
+def _scan_tasks(path: str, options: Dict[str, Any]) -> Iterator[Tuple[int, Optional[int]]]:
+    """Yield the (start, end) byte ranges of path that worker processes scan as separate tasks.
+
+    A large .jsonl file with single-byte newlines is cut into ~_TASK_SIZE
+    runs of whole lines and any other small file is a single (0, None)
+    task. Yields nothing for other large files, which the main process
+    streams itself.
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        # Let scan_file report it.
+        size = 0
+    if size <= _TASK_SIZE:
+        yield 0, None
+        return
+    if os.path.splitext(path)[1].lower() != ".jsonl" or "\n".encode(options["encoding"]) != b"\n":
+        return
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            f.seek(start + _TASK_SIZE)
+            f.readline()
+            end = min(f.tell(), size)
+            yield start, end
+            start = end
+
+
+def _count_newlines(path: str, start: int, end: int) -> int:
+    with open(path, "rb") as f:
+        f.seek(start)
+        count = 0
+        while f.tell() < end:
+            buf = f.read(min(_READ_CHUNK_SIZE, end - f.tell()))
+            if not buf:
+                break
+            count += buf.count(b"\n")
+    return count
+
+
+# Per-process state for worker processes, set up by _init_worker. Matchers
+# are rebuilt from the keyword strings since compiled backends may not pickle.
+_worker_pattern: Optional[Matcher] = None
+_worker_options: Dict[str, Any] = {}
+
+
+def _init_worker(keywords: Sequence[str], options: Dict[str, Any]) -> None:
+    global _worker_pattern, _worker_options
+    _worker_pattern, _ = build_matcher(keywords)
+    _worker_options = options
+
+
+def _scan_task_in_worker(path: str, start: int, end: Optional[int]) -> Tuple[int, int, List[Tuple[int, int, List[str], Any]]]:
+    """Scan one task from _scan_tasks; returns (records scanned, newlines in the range, matches)."""
+    assert _worker_pattern is not None, "worker not initialized"
+    scanned = 0
+    matched: List[Tuple[int, int, List[str], Any]] = []
+    for count, chunk in scan_file(path, _worker_pattern, _worker_options, start, end):
+        scanned += count
+        matched.extend(chunk)
+    return scanned, 0 if end is None else _count_newlines(path, start, end), matched
+
+
+def _iter_parallel_scans(
+    paths: Iterable[str],
+    pool: ProcessPoolExecutor,
+    pattern: Matcher,
+    options: Dict[str, Any],
+    window: int,
+) -> Iterator[Tuple[str, Iterator[ScanChunk]]]:
+    """Yield (path, chunks) like scanning each path with scan_file, with parts of files scanned ahead in pool.
+
+    Results come back in input order, so output matches a sequential run
+    and --max-records cuts at the same record. At most window parts are
+    submitted or waiting at a time, which bounds the results held in memory.
+    """
+
+    def iter_parts() -> Iterator[Tuple[str, bool, Optional[Tuple[int, Optional[int]]]]]:
+        # (path, first part of the file, worker task or None to scan in place)
+        for path in paths:
+            tasks = _scan_tasks(path, options)
+            task = next(tasks, None)
+            yield path, True, task
+            for task in tasks:
+                yield path, False, task
+
+    parts = iter_parts()
+    pending: Deque[Tuple[str, bool, Any]] = deque()
+
+    def fill() -> None:
+        while len(pending) < window:
+            part = next(parts, None)
+            if part is None:
+                return
+            path, first, task = part
+            future = None if task is None else pool.submit(_scan_task_in_worker, path, *task)
+            pending.append((path, first, future))
+
+    def file_chunks(path: str, future: Any) -> Iterator[ScanChunk]:
+        if future is None:
+            yield from scan_file(path, pattern, options)
+            return
+        # Positions and line numbers of later parts continue from earlier ones.
+        scanned = 0
+        lines = 0
+        while True:
+            count, newlines, matched = future.result()
+            yield count, [(scanned + pos, lines + line_no, hits, record) for pos, line_no, hits, record in matched]
+            scanned += count
+            lines += newlines
+            fill()
+            if not pending or pending[0][1]:
+                return
+            future = pending.popleft()[2]
+
+    fill()
+    while pending:
+        path, first, future = pending.popleft()
+        fill()
+        if first:
+            yield path, file_chunks(path, future)
+        # Otherwise the caller stopped reading the previous file's chunks early.
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Extract heart-disease related content from MedQA dataset files into a new JSONL file."
@@ -294,6 +1463,12 @@ def main() -> int:
         default=0,
         help="Stop after scanning N records total (0 = no limit)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Number of worker processes scanning files in parallel (default: 0 = one per CPU)",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -325,75 +1500,78 @@ def main() -> int:
     # Validate max_records
     if args.max_records < 0:
         raise SystemExit("Error: --max-records must be non-negative")
+    if args.workers < 0:
+        raise SystemExit("Error: --workers must be non-negative")
+    workers = args.workers or os.cpu_count() or 1
+
+    options: Dict[str, Any] = {
+        "encoding": args.encoding,
+        "min_line_length": args.min_line_length,
+        "max_flatten_items": args.max_flatten_items,
+        "include_fields": include_fields,
+        "exclude_fields": exclude_fields,
+        "max_hits_per_record": args.max_hits_per_record,
+        # No single file can contribute more than the global limit.
+        "max_records": args.max_records,
+        # Lets UTF-8 .jsonl files skip lines that cannot match without parsing
+        # them. Hyperscan checks a line faster than the prefilter's searches.
+        "line_prefilter": None if isinstance(pattern, HyperscanMatcher) else build_line_prefilter(normalized_keywords),
+        # Whether matching can skip lines on a keyword check of the raw line.
+        "raw_line_check": raw_line_check_is_safe(normalized_keywords),
+    }
 
     total_records = 0
     matched_records = 0
     scanned_files = 0
 
     out_f = None
+    # Encoded records are collected here and written out in ~1 MiB pieces.
+    out_buf = bytearray()
     if not args.dry_run:
         try:
             ensure_parent_dir(args.output)
-            out_f = open(args.output, "w", encoding="utf-8")
+            out_f = open(args.output, "wb", buffering=_WRITE_BUFFER_SIZE)
         except IOError as e:
             raise SystemExit(f"Error: Failed to open output file '{args.output}': {e}")
 
+    pool = None
     try:
-        for path in iter_files(args.input, allowed_exts):
-            scanned_files += 1
-            ext = os.path.splitext(path)[1].lower()
-
-            try:
-                if ext == ".jsonl":
-                    record_iter: Iterable[Tuple[int, Any]] = iter_jsonl_records(path, args.encoding)
-                elif ext == ".txt":
-                    record_iter = iter_txt_records(path, args.encoding, args.min_line_length)
-                elif ext == ".json":
-                    record_iter = _load_json_file(path, args.encoding)
-                else:
-                    continue
-            except (IOError, ValueError) as e:
-                print(f"Warning: Skipping file '{path}': {e}", flush=True)
-                continue
+        paths = iter_files(args.input, allowed_exts)
+        if workers > 1 and not os.path.isfile(args.input):
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(keywords_list, options),
+            )
+            results: Iterable[Tuple[str, Iterator[ScanChunk]]] = _iter_parallel_scans(
+                paths, pool, pattern, options, window=2 * workers
+            )
+        else:
+            results = ((path, scan_file(path, pattern, options)) for path in paths)
 
-            for line_no, record in record_iter:
-                total_records += 1
-                if args.max_records and total_records > args.max_records:
+        for path, chunks in results:
+            scanned_files += 1
+            # Match positions count from the first record of the file.
+            file_start = total_records
+            for scanned, matched in chunks:
+                for position, line_no, hits, record in matched:
+                    if args.max_records and file_start + position > args.max_records:
+                        break
+                    matched_records += 1
+                    if out_f is not None:
+                        out_buf += fast_json.dumps(_output_record(path, line_no, hits, record))
+                        out_buf += b"\n"
+                        if len(out_buf) >= _WRITE_BUFFER_SIZE:
+                            try:
+                                out_f.write(out_buf)
+                            except IOError as e:
+                                raise SystemExit(f"Error: Failed to write to output file: {e}")
+                            out_buf.clear()
+                total_records += scanned
+                if args.max_records and total_records >= args.max_records:
+                    total_records = args.max_records
                     break
 
-                text = extract_text_from_record(
-                    record,
-                    args.max_flatten_items,
-                    include_fields=include_fields,
-                    exclude_fields=exclude_fields,
-                )
-                hits = detect_matches(pattern, text, args.max_hits_per_record)
-                if not hits:
-                    continue
-
-                matched_records += 1
-                meta = {
-                    "source_path": path,
-                    "source_line": line_no,
-                    "matched_keywords": hits,
-                }
-                filtered_record = filter_record_for_output(
-                    record,
-                    include_fields=include_fields,
-                    exclude_fields=exclude_fields,
-                )
-                if isinstance(filtered_record, dict):
-                    out_record = dict(filtered_record)
-                    out_record["_extract_meta"] = meta
-                else:
-                    out_record = {"raw": filtered_record, "_extract_meta": meta}
-
-                if out_f is not None:
-                    try:
-                        out_f.write(json.dumps(out_record, ensure_ascii=False) + "\n")
-                    except IOError as e:
-                        raise SystemExit(f"Error: Failed to write to output file: {e}")
-
             if args.max_records and total_records >= args.max_records:
                 break
     except KeyboardInterrupt:
@@ -403,8 +1581,11 @@ def main() -> int:
         print(f"Error: Unexpected error during processing: {e}", flush=True)
         return 1
     finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
         if out_f is not None:
             try:
+                out_f.write(out_buf)
                 out_f.close()
             except IOError as e:
                 print(f"Warning: Error closing output file: {e}", flush=True)
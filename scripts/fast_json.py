@@ -0,0 +1,76 @@
+"""JSON parsing and encoding for the scripts, through orjson when it is installed.
+
+loads and dumps give the same values as the json module does: input that
+orjson reads differently is parsed with json, and values it would encode
+differently are encoded with json, in orjson's compact form.
+"""
+import json
+import math
+import re
+from typing import Any, Union
+
+try:
+    import orjson  # type: ignore  # optional: pip install orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+
+# Integers of 19 digits or more may not fit in 64 bits. Depending on the
+# version, orjson rejects those or silently parses them as floats.
+_LONG_DIGITS_RE = re.compile(r"\d{19}")
+_LONG_DIGITS_BYTES_RE = re.compile(rb"\d{19}")
+
+
+def _text(data: Union[str, bytes]) -> str:
+    # json.loads decodes bytes with surrogatepass, which turns surrogate
+    # code points encoded in UTF-8 into lone surrogates that cannot be
+    # encoded again. Decoding strictly raises UnicodeDecodeError instead.
+    return data.decode("utf-8") if isinstance(data, bytes) else data
+
+
+def _has_non_finite_float(obj: Any) -> bool:
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+if orjson is not None:
+
+    def loads(data: Union[str, bytes]) -> Any:
+        digits_re = _LONG_DIGITS_BYTES_RE if isinstance(data, bytes) else _LONG_DIGITS_RE
+        if digits_re.search(data) is None:  # type: ignore[arg-type]
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # orjson also rejects NaN and Infinity; retry so those still
+                # parse and errors keep json's messages.
+                pass
+        return json.loads(_text(data))
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            data = orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits or non-str keys
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # orjson writes NaN and Infinity as null where json keeps them, so
+        # output containing a null may need json's encoding instead.
+        if b"null" in data and _has_non_finite_float(obj):
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return data
+
+else:
+
+    def loads(data: Union[str, bytes]) -> Any:
+        return json.loads(_text(data))
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
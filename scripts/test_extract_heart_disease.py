@@ -0,0 +1,262 @@
+"""Tests for extract_heart_disease: matcher backends against the re path, and JSONL reading.
+
+Run with: python -m unittest discover scripts (or python -m pytest scripts)
+"""
+import contextlib
+import io
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import extract_heart_disease as ehd
+
+
+KEYWORDS = ehd.DEFAULT_KEYWORDS_EN + ehd.DEFAULT_KEYWORDS_ZH + ["x-ray", "stroke", "AKI", "CK"]
+
+# Keywords with non-ASCII cased characters, which only re.IGNORECASE matches
+# like the baseline does.
+NON_ASCII_KEYWORDS = ["οδοσ", "μg", "ı", "İstanbul", "Müller", "heart disease", "MI"]
+
+WORDS = [
+    "heart", "Heart", "HEART", "disease", "failure", "atrial", "fibrillation", "MI", "mi", "MIX", "_MI",
+    "cad", "CAD", "cardiac", "STEMI", "NSTEMI", "心脏病", "心脏", "心梗", "müller", "MÜLLER", "x-ray",
+    "İstanbul", "é", "patient", "2", "stroke", "stro\u212ae", "AKI", "A\u212aI", "CK", "C\u212a", "\u212a",
+    "\u017fTEMI", "card\u0131ac", "M\u0130", "\u0130", "\u0131", "\u017f", "\u017ftro\u212ae",
+    "ΟΔΟΣ", "οδος", "\u00b5g", "ΜG", "I", "istanbul", "ISTANBUL", "MULLER",
+]
+SEPARATORS = ["", " ", "  ", "\t", "\n", " \r\n ", "　", "-", ".", "_"]
+
+
+def baseline_pattern(keywords):
+    """The keyword regex as build_matcher compiled it before any other matcher existed."""
+    parts = []
+    for kw in keywords:
+        if any("\u4e00" <= ch <= "\u9fff" for ch in kw):
+            parts.append(re.escape(kw))
+            continue
+        simple_wordish = re.fullmatch(r"[A-Za-z0-9]+", kw) is not None
+        is_short = len(kw) <= 3
+        is_all_caps = kw.isupper() and any(c.isalpha() for c in kw)
+        if simple_wordish and (is_short or is_all_caps):
+            parts.append(r"\b" + re.escape(kw) + r"\b")
+        else:
+            tokens = [re.escape(t) for t in kw.split()]
+            if len(tokens) > 1:
+                parts.append(r"\b" + r"\s+".join(tokens) + r"\b")
+            else:
+                parts.append(re.escape(kw))
+    return re.compile(r"(" + "|".join(parts) + r")", re.IGNORECASE)
+
+
+def baseline_hits(pattern, text, max_hits):
+    return [m.group(0) for m in itertools.islice(pattern.finditer(text), max_hits)]
+
+
+def random_text(rnd):
+    return "".join(rnd.choice(WORDS) + rnd.choice(SEPARATORS) for _ in range(rnd.randint(1, 12)))
+
+
+def _backends():
+    specs = [ehd._keyword_spec(kw)[1:] for kw in KEYWORDS]
+    backends = {"LiteralMatcher": ehd.LiteralMatcher(specs), "RegexMatcher": ehd._build_regex_matcher(KEYWORDS)}
+    if ehd.ahocorasick is not None:
+        backends["AhoCorasickMatcher"] = ehd.AhoCorasickMatcher(specs)
+    if ehd.njit is not None:
+        backends["CompiledLiteralMatcher"] = ehd.CompiledLiteralMatcher.create(specs)
+    if ehd.hyperscan is not None:
+        backends["HyperscanMatcher"] = ehd.HyperscanMatcher(specs)
+    return backends
+
+
+class MatcherBackendTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.reference = baseline_pattern(KEYWORDS)
+        cls.backends = _backends()
+
+    def assert_same_hits(self, text, max_hits=20):
+        expected = baseline_hits(self.reference, text, max_hits)
+        for name, matcher in self.backends.items():
+            with self.subTest(backend=name, text=text, max_hits=max_hits):
+                self.assertEqual(matcher.find_hits(text, max_hits), expected)
+                self.assertEqual(matcher.has_match(text), bool(expected))
+
+    def test_hits_keep_original_whitespace(self):
+        self.assertEqual(baseline_hits(self.reference, "Heart\t\n disease", 20), ["Heart\t\n disease"])
+        self.assert_same_hits("Heart\t\n disease, heart  failure and atrial　fibrillation")
+
+    def test_word_boundaries(self):
+        for text in ["MI", "MIX", "_MI", "MI_", "2MI", "éMI", "MIé", "(MI)", "cadaver", "CAD-2", "C\u212a", "(C\u212a)"]:
+            self.assert_same_hits(text)
+
+    def test_non_ascii_case_variants_of_ascii_letters(self):
+        for text in ["M\u0130", "M\u0131", "\u017fTEMI", "card\u0130ac", "a\u017fk \u212a"]:
+            self.assert_same_hits(text)
+
+    def test_random_texts(self):
+        rnd = random.Random(0)
+        for _ in range(2000):
+            self.assert_same_hits(random_text(rnd), max_hits=rnd.choice([1, 2, 20]))
+
+    def test_non_ascii_keywords(self):
+        matcher, _ = ehd.build_matcher(NON_ASCII_KEYWORDS)
+        reference = baseline_pattern(NON_ASCII_KEYWORDS)
+        rnd = random.Random(1)
+        texts = ["ΟΔΟΣ", "\u00b5g", "I", "istanbul", "MÜLLER"] + [random_text(rnd) for _ in range(500)]
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertEqual(matcher.find_hits(text, 20), baseline_hits(reference, text, 20))
+                self.assertEqual(matcher.has_match(text), reference.search(text) is not None)
+
+
+def run_main(*args):
+    """Run the script's main with args; returns (exit code, stdout)."""
+    out = io.StringIO()
+    with mock.patch.object(sys, "argv", ["extract_heart_disease.py", *args]), contextlib.redirect_stdout(out):
+        code = ehd.main()
+    return code, out.getvalue()
+
+
+def scan_options(**overrides):
+    options = {
+        "encoding": "utf-8",
+        "min_line_length": 20,
+        "max_flatten_items": 200,
+        "include_fields": None,
+        "exclude_fields": ["meta_info"],
+        "max_hits_per_record": 20,
+        "max_records": 0,
+        "line_prefilter": None,
+        "raw_line_check": False,
+    }
+    options.update(overrides)
+    return options
+
+
+def scan_all(path, matcher, options):
+    """Return scan_file's chunks merged into (records scanned, matches with records as repr)."""
+    scanned = 0
+    matches = []
+    for count, chunk in ehd.scan_file(path, matcher, options):
+        scanned += count
+        matches.extend((position, line_no, hits, repr(record)) for position, line_no, hits, record in chunk)
+    return scanned, matches
+
+
+def random_jsonl(rnd, lines=40):
+    """Random JSONL bytes with the lines the line prefilter has to get right."""
+    out = []
+    for _ in range(lines):
+        text = random_text(rnd)
+        line = rnd.choice([
+            lambda: json.dumps({"q": text}, ensure_ascii=False).encode("utf-8"),
+            lambda: json.dumps({"q": text}).encode("utf-8"),
+            lambda: json.dumps({"q": text, "n": rnd.choice([1, 1e5, -2.5, True, None])}, ensure_ascii=False).encode(),
+            lambda: json.dumps([text, 3], ensure_ascii=False).encode("utf-8"),
+            lambda: b'{"q": "' + text.replace("\n", " ").encode("utf-8") + b'"',
+            lambda: b'{"q": "\xff ' + json.dumps(text)[1:].encode("utf-8") + b"}",
+            lambda: b"\xed\xa0\x80 cardiac",
+            lambda: rnd.choice([b"", b" ", b"\t", b"\r", b"\xc2\xa0", b"\xe3\x80\x80 ", b"\x1c"]),
+            lambda: ("\u3000" + json.dumps({"q": text}, ensure_ascii=False) + "\u2028").encode("utf-8"),
+        ])()
+        out.append(line + rnd.choice([b"", b"\r"]))
+    return b"\n".join(out) + rnd.choice([b"", b"\n"])
+
+
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def write(self, name, data):
+        path = os.path.join(self.dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+
+class JsonlReadingTest(TempDirTestCase):
+    def test_surrogate_bytes_are_replaced(self):
+        # Surrogate code points encoded in UTF-8 are invalid; like undecodable
+        # bytes they become U+FFFD instead of lone surrogates.
+        path = self.write("s.jsonl", b'{"q":"sur \xed\xa0\x80 cardiac"}\n{"q":"cardiac ok"}\n')
+        output = os.path.join(self.dir, "out.jsonl")
+        code, stdout = run_main("--input", path, "--output", output)
+        self.assertEqual(code, 0, stdout)
+        self.assertIn("Matched records/lines: 2", stdout)
+        with open(output, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["q"] for r in records], ["sur \ufffd\ufffd\ufffd cardiac", "cardiac ok"])
+
+    def test_lines_are_stripped_like_str_strip(self):
+        # Lines of only non-ASCII whitespace are blank and not counted,
+        # values wrapped in it still parse, and a BOM is not whitespace.
+        data = "\ufeff{\"q\":\"bom cardiac\"}\n\u00a0\n\u3000 \n\x1c\n\u3000{\"q\":\"cardiac\"}\u2028\n \n{\"q\":\"x\"}\n"
+        path = self.write("w.jsonl", data.encode("utf-8"))
+        records = [record for _, record, _ in ehd.iter_jsonl_records(path, "utf-8")]
+        self.assertEqual(records[1:], [{"q": "cardiac"}, {"q": "x"}])
+        self.assertEqual(records[0]["text"], "\ufeff{\"q\":\"bom cardiac\"}")
+        self.assertIn("_parse_error", records[0])
+        for workers in ("1", "2"):
+            code, stdout = run_main("--input", path, "--output", os.path.join(self.dir, "out.jsonl"), "--workers", workers)
+            self.assertEqual(code, 0, stdout)
+            self.assertIn("Total records/lines scanned: 3", stdout)
+
+
+
+class LinePrefilterTest(TempDirTestCase):
+    KEYWORD_SETS = [KEYWORDS, ["cardiac", "MI"], ["heart disease"], ["stroke", "CK"], ["İstanbul", "MI"]]
+
+    def test_prefilter_only_skips_lines_that_cannot_match(self):
+        # The same records, positions and line numbers as parsing every line,
+        # also with runs of a few bytes, which split the file at most lines.
+        rnd = random.Random(2)
+        for keywords in self.KEYWORD_SETS:
+            matcher, cleaned = ehd.build_matcher(keywords)
+            prefilter = ehd.build_line_prefilter(cleaned)
+            self.assertIsNotNone(prefilter)
+            fast = {"line_prefilter": prefilter, "raw_line_check": ehd.raw_line_check_is_safe(cleaned)}
+            for _ in range(30):
+                path = self.write("p.jsonl", random_jsonl(rnd))
+                chunk_size = rnd.choice([1, 64, 1 << 20])
+                for max_records in (0, 7):
+                    with self.subTest(keywords=keywords[:3], chunk_size=chunk_size, max_records=max_records):
+                        expected = scan_all(path, matcher, scan_options(max_records=max_records))
+                        with mock.patch.object(ehd, "_READ_CHUNK_SIZE", chunk_size):
+                            got = scan_all(path, matcher, scan_options(max_records=max_records, **fast))
+                        self.assertEqual(got, expected)
+
+
+
+class ParallelScanTest(TempDirTestCase):
+    def run_workers(self, workers, *args):
+        output = os.path.join(self.dir, f"out{workers}.jsonl")
+        code, stdout = run_main("--input", os.path.join(self.dir, "in"), "--output", output, "--workers", str(workers), *args)
+        self.assertEqual(code, 0, stdout)
+        with open(output, "rb") as f:
+            return f.read(), stdout.replace(output, "OUTPUT")
+
+    def test_workers_give_the_same_output_as_one_process(self):
+        rnd = random.Random(3)
+        os.makedirs(os.path.join(self.dir, "in", "sub"))
+        self.write("in/a.jsonl", random_jsonl(rnd, lines=400))
+        self.write("in/b.json", json.dumps([random_text(rnd) for _ in range(50)]).encode("utf-8"))
+        self.write("in/c.txt", "\n".join(random_text(rnd) for _ in range(100)).encode("utf-8"))
+        self.write("in/sub/d.jsonl", random_jsonl(rnd, lines=300))
+        self.write("in/sub/e.jsonl", b"")
+        # Files of a few KiB become many tasks, and the limits cut inside them.
+        with mock.patch.object(ehd, "_TASK_SIZE", 512):
+            for args in [(), ("--max-records", "137"), ("--max-records", "520"), ("--fields", "q", "--language", "en")]:
+                with self.subTest(args=args):
+                    self.assertEqual(self.run_workers(3, *args), self.run_workers(1, *args))
+
+
+if __name__ == "__main__":
+    unittest.main()
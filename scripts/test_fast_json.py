@@ -0,0 +1,37 @@
+"""fast_json must give the same values as the json module, with or without orjson installed."""
+import json
+import math
+import unittest
+
+import fast_json
+
+
+class FastJsonTest(unittest.TestCase):
+    def test_loads_keeps_long_integers(self):
+        for line in [b'{"a": 123456789012345678901234567890}', '{"a": -9999999999999999999}']:
+            with self.subTest(line=line):
+                value = fast_json.loads(line)["a"]
+                self.assertIsInstance(value, int)
+                self.assertEqual(value, json.loads(line)["a"])
+
+    def test_loads_non_finite_floats(self):
+        record = fast_json.loads(b'{"a": NaN, "b": -Infinity}')
+        self.assertTrue(math.isnan(record["a"]))
+        self.assertEqual(record["b"], -math.inf)
+
+    def test_dumps_round_trips_values_orjson_cannot_encode(self):
+        for record in [{"a": 2**70}, {"a": math.inf}, {"a": [1, None, -math.inf]}, {1: "b"}]:
+            with self.subTest(record=record):
+                data = fast_json.dumps(record)
+                self.assertEqual(repr(json.loads(data)), repr(json.loads(json.dumps(record))))
+
+    def test_dumps_uses_one_format(self):
+        # Records encoded by json keep the separators orjson uses.
+        plain = fast_json.dumps({"a": [1, 2]})
+        fallback = fast_json.dumps({"a": [1, 2**70]})
+        self.assertEqual(b", " in plain, b", " in fallback)
+        self.assertEqual(b'": ' in plain, b'": ' in fallback)
+
+
+if __name__ == "__main__":
+    unittest.main()